@@ -0,0 +1,427 @@
+"""youtube_summary 오프라인 벤치마크
+
+YouTube Data API / 자막 수집 / OpenAI / 구글 시트를 모두 로컬 대역(fake)으로 바꿔서
+async_main을 처음부터 끝까지 실행하고 처리량과 단계별 지연 시간을 측정합니다.
+API 할당량, 프록시 트래픽, OpenAI 토큰을 쓰지 않습니다.
+
+    python youtube_benchmark.py --channels 5 --videos-per-channel 40 --concurrency 4
+    python youtube_benchmark.py --ip-block-rate 0.2 --chat-rate-limit-rate 0.1
+    python youtube_benchmark.py --videos-per-channel 60 --batch
+"""
+import os, sys, json, time, random, asyncio, argparse, threading, tracemalloc, re
+from types import SimpleNamespace
+try:
+    import resource
+except ImportError: # Windows에는 resource 모듈이 없음 -> tracemalloc 최대치만 출력
+    resource = None
+
+from aiohttp import web
+
+# youtube_summary는 import 시점에 OpenAI 클라이언트를 만들기 때문에 가짜 키를 먼저 넣어둠
+os.environ.setdefault("OPENAI_API_KEY", "benchmark")
+import openai
+import youtube_summary as ys
+from youtube_transcript_api._errors import IpBlocked, TranscriptsDisabled
+
+# 단계별 지연 시간 기록: {stage: [초, ...]}
+latencies = {}
+_latency_lock = threading.Lock()
+
+def record(stage, seconds):
+    with _latency_lock:
+        latencies.setdefault(stage, []).append(seconds)
+
+def jitter(mean):
+    return mean * random.uniform(0.5, 1.5) if mean > 0 else 0
+
+def format_memory(traced_peak):
+    text = f"tracemalloc 최대 {traced_peak / 1024 ** 2:.1f}MB"
+    if resource is not None:
+        # ru_maxrss 단위: macOS는 바이트, Linux 등은 KB
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        max_rss_mb = max_rss / 1024 ** 2 if sys.platform == "darwin" else max_rss / 1024
+        text += f" / RSS 최대 {max_rss_mb:.1f}MB"
+    return text
+
+def percentile(values, p):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))]
+
+# ==========================================
+# 1. YouTube Data API 대역 (channels / playlistItems)
+# ==========================================
+class _Request:
+    def __init__(self, fn, latency):
+        self.fn = fn
+        self.latency = latency
+
+    def execute(self):
+        started = time.perf_counter()
+        time.sleep(jitter(self.latency))
+        result = self.fn()
+        record("YouTube API", time.perf_counter() - started)
+        return result
+
+class FakeYouTube:
+    def __init__(self, channel_count, videos_per_channel, latency):
+        self.latency = latency
+        self.channels_data = {}
+        for c in range(channel_count):
+            channel_id = f"UCbench{c:04d}"
+            videos = [
+                {"id": f"v{c:04d}x{v:05d}", "title": f"벤치마크 영상 {c}-{v}", "date": f"2025-{(v % 12) + 1:02d}-{(v % 28) + 1:02d}"}
+                for v in range(videos_per_channel)
+            ]
+            videos.sort(key=lambda item: item["date"], reverse=True) # 재생목록은 최신순
+            self.channels_data[channel_id] = {"title": f"벤치마크 채널 {c}", "videos": videos}
+
+    def channels(self):
+        return SimpleNamespace(list=lambda id=None, **kwargs: _Request(lambda: {
+            "items": [{"id": id, "snippet": {"title": self.channels_data[id]["title"]}}] if id in self.channels_data else []
+        }, self.latency))
+
+    def playlistItems(self):
+        def list_items(playlistId, pageToken=None, maxResults=50, **kwargs):
+            def page():
+                videos = self.channels_data[playlistId.replace("UULF", "UC", 1)]["videos"]
+                start = int(pageToken or 0)
+                items = [
+                    {"snippet": {"resourceId": {"videoId": v["id"]}, "title": v["title"], "publishedAt": f"{v['date']}T00:00:00Z"}}
+                    for v in videos[start:start + maxResults]
+                ]
+                result = {"items": items}
+                if start + maxResults < len(videos): result["nextPageToken"] = str(start + maxResults)
+                return result
+            return _Request(page, self.latency)
+        return SimpleNamespace(list=list_items)
+
+# ==========================================
+# 2. 자막 수집 대역 (YouTubeTranscriptApi 자리)
+# ==========================================
+class FakeTranscriptApi:
+    latency = 1.0
+    ip_block_rate = 0.0
+    disabled_rate = 0.0
+    error_rate = 0.0
+    words = 2000
+    long_rate = 0.0     # 이 비율의 영상은 words의 20배 길이 (map-reduce 경로 확인용)
+
+    def __init__(self, proxy_config=None):
+        self.proxy_config = proxy_config
+
+    def fetch(self, video_id, languages=None):
+        time.sleep(jitter(self.latency))
+        roll = random.random()
+        if roll < self.ip_block_rate: raise IpBlocked(video_id)
+        roll -= self.ip_block_rate
+        if roll < self.disabled_rate: raise TranscriptsDisabled(video_id)
+        roll -= self.disabled_rate
+        if roll < self.error_rate: raise ConnectionError("fake transcript network error")
+
+        words = self.words * (20 if random.random() < self.long_rate else 1)
+        sentence = "오늘은 수능 수학 공부법에 대해 이야기해 보겠습니다."
+        text = " ".join([sentence] * max(1, words // len(sentence.split())))
+        return SimpleNamespace(snippets=[SimpleNamespace(text=text)])
+
+# ==========================================
+# 3. OpenAI 대역 서버 (chat.completions + Batch API)
+# ==========================================
+class FakeOpenAIServer:
+    def __init__(self, latency, error_rate, rate_limit_rate, batch_latency):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.batch_latency = batch_latency
+        self.files = {}
+        self.batches = {}
+        self.runner = None
+        self.base_url = None
+
+    def _completion(self, body):
+        content = "- 벤치마크 요약 1\n- 벤치마크 요약 2\n- 벤치마크 요약 3"
+        prompt_tokens = sum(len(m.get("content", "")) for m in body.get("messages", [])) // 2
+        return {
+            "id": f"chatcmpl-{random.getrandbits(32):x}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4o-mini"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 30, "total_tokens": prompt_tokens + 30},
+        }
+
+    async def chat(self, request):
+        body = await request.json()
+        await asyncio.sleep(jitter(self.latency))
+        roll = random.random()
+        if roll < self.rate_limit_rate:
+            return web.json_response({"error": {"message": "Rate limit reached", "type": "requests"}}, status=429, headers={"retry-after-ms": "500"})
+        if roll < self.rate_limit_rate + self.error_rate:
+            return web.json_response({"error": {"message": "fake server error", "type": "server_error"}}, status=500)
+        return web.json_response(self._completion(body))
+
+    async def upload_file(self, request):
+        form = await request.post()
+        upload = form["file"]
+        file_id = f"file-{len(self.files) + 1}"
+        self.files[file_id] = upload.file.read().decode("utf-8")
+        return web.json_response({
+            "id": file_id, "object": "file", "bytes": len(self.files[file_id]), "created_at": int(time.time()),
+            "filename": upload.filename, "purpose": form.get("purpose", "batch"), "status": "processed",
+        })
+
+    async def file_content(self, request):
+        return web.Response(text=self.files[request.match_info["file_id"]])
+
+    def _batch_json(self, batch_id):
+        batch = self.batches[batch_id]
+        finished = batch["status"] == "in_progress" and time.monotonic() >= batch["ready_at"]
+        if finished or batch["status"] == "cancelling":
+            lines = []
+            items = [json.loads(line) for line in self.files[batch["input_file_id"]].splitlines()]
+            if not finished:
+                # 취소된 배치는 진행된 비율만큼만 결과가 남음
+                created = batch["ready_at"] - self.batch_latency
+                progress = min(1.0, (time.monotonic() - created) / self.batch_latency) if self.batch_latency > 0 else 1.0
+                items = items[:int(len(items) * progress)]
+            for item in items:
+                if random.random() < self.error_rate:
+                    lines.append({"custom_id": item["custom_id"], "response": None, "error": {"code": "server_error", "message": "fake"}})
+                else:
+                    lines.append({"custom_id": item["custom_id"], "response": {"status_code": 200, "body": self._completion(item["body"])}, "error": None})
+            output_id = f"file-{len(self.files) + 1}"
+            self.files[output_id] = "\n".join(json.dumps(l, ensure_ascii=False) for l in lines)
+            batch.update(status="completed" if finished else "cancelled", output_file_id=output_id)
+        return {k: v for k, v in batch.items() if k != "ready_at"}
+
+    async def create_batch(self, request):
+        body = await request.json()
+        batch_id = f"batch-{len(self.batches) + 1}"
+        self.batches[batch_id] = {
+            "id": batch_id, "object": "batch", "endpoint": body["endpoint"], "input_file_id": body["input_file_id"],
+            "completion_window": body["completion_window"], "status": "in_progress", "created_at": int(time.time()),
+            "output_file_id": None, "ready_at": time.monotonic() + self.batch_latency,
+        }
+        return web.json_response(self._batch_json(batch_id))
+
+    async def get_batch(self, request):
+        return web.json_response(self._batch_json(request.match_info["batch_id"]))
+
+    async def cancel_batch(self, request):
+        batch_id = request.match_info["batch_id"]
+        batch = self.batches[batch_id]
+        if batch["status"] == "in_progress":
+            batch["status"] = "cancelling"
+            return web.json_response({k: v for k, v in batch.items() if k != "ready_at"})
+        return web.json_response(self._batch_json(batch_id))
+
+    async def start(self):
+        app = web.Application(client_max_size=1024 ** 3)
+        app.router.add_post("/v1/chat/completions", self.chat)
+        app.router.add_post("/v1/files", self.upload_file)
+        app.router.add_get("/v1/files/{file_id}/content", self.file_content)
+        app.router.add_post("/v1/batches", self.create_batch)
+        app.router.add_get("/v1/batches/{batch_id}", self.get_batch)
+        app.router.add_post("/v1/batches/{batch_id}/cancel", self.cancel_batch)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = f"http://127.0.0.1:{port}/v1"
+        return self
+
+    async def stop(self):
+        await self.runner.cleanup()
+
+# ==========================================
+# 4. 구글 시트 대역 (메모리 워크시트)
+# ==========================================
+def _parse_a1(a1):
+    """'D3:E5' -> (열 시작, 열 끝, 행 시작, 행 끝 또는 None). 열은 0부터"""
+    a1 = a1.split("!")[-1]
+    if ":" not in a1: a1 = f"{a1}:{a1}" # 단일 셀 'F5'
+    match = re.fullmatch(r"([A-Z])(\d+):([A-Z])(\d*)", a1)
+    col_a, row_a, col_b, row_b = match.groups()
+    return ord(col_a) - 65, ord(col_b) - 65, int(row_a), int(row_b) if row_b else None
+
+class FakeWorksheet:
+    def __init__(self, spreadsheet, title, sheet_id, header):
+        self.spreadsheet = spreadsheet
+        self.title = title
+        self.id = sheet_id
+        self.rows = [header]
+
+    def batch_get(self, ranges):
+        self.spreadsheet.wait("시트 읽기")
+        result = []
+        for a1 in ranges:
+            col_a, col_b, row_a, row_b = _parse_a1(a1)
+            values = [
+                [v for v in row[col_a:col_b + 1]]
+                for row in self.rows[row_a - 1:row_b if row_b else None]
+            ]
+            while values and not any(values[-1]): values.pop()
+            result.append(values)
+        return result
+
+    def batch_update(self, data, **kwargs):
+        self.spreadsheet.wait("시트 쓰기")
+        for item in data:
+            col_a, _, row_a, _ = _parse_a1(item["range"])
+            for offset, values in enumerate(item["values"]):
+                row = self.rows[row_a - 1 + offset]
+                row[col_a:col_a + len(values)] = values
+        return {}
+
+class FakeSpreadsheet:
+    def __init__(self, latency, error_rate):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.sheet = FakeWorksheet(self, ys.TARGET_SHEET_NAME, 1, ["채널명", "날짜", "제목", "스크립트", "GPT요약", "URL"])
+        self.log_sheet = FakeWorksheet(self, ys.LOG_SHEET_NAME, 2, ["URL", "수집일시"])
+
+    def wait(self, stage):
+        started = time.perf_counter()
+        time.sleep(jitter(self.latency))
+        record(stage, time.perf_counter() - started)
+        if random.random() < self.error_rate: raise ConnectionError("fake sheets error")
+
+    def batch_update(self, body):
+        self.wait("시트 쓰기")
+        sheets = {self.sheet.id: self.sheet, self.log_sheet.id: self.log_sheet}
+        for request in body["requests"]:
+            append = request["appendCells"]
+            sheets[append["sheetId"]].rows.extend(
+                [cell["userEnteredValue"]["stringValue"] for cell in row["values"]] for row in append["rows"]
+            )
+        return {}
+
+# ==========================================
+# 5. 실행
+# ==========================================
+def install_fakes(args, server, spreadsheet):
+    youtube = FakeYouTube(args.channels, args.videos_per_channel, args.youtube_latency)
+    ys.build = lambda *a, **kw: youtube
+    ys.fetch_channel_ids_from_sheet = lambda: list(youtube.channels_data)
+    ys.connect_google_sheet = lambda sheet_name=None: spreadsheet.log_sheet if sheet_name == ys.LOG_SHEET_NAME else spreadsheet.sheet
+
+    FakeTranscriptApi.latency = args.transcript_latency
+    FakeTranscriptApi.ip_block_rate = args.ip_block_rate
+    FakeTranscriptApi.disabled_rate = args.disabled_rate
+    FakeTranscriptApi.error_rate = args.transcript_error_rate
+    FakeTranscriptApi.words = args.transcript_words
+    FakeTranscriptApi.long_rate = args.long_rate
+    ys.YouTubeTranscriptApi = FakeTranscriptApi
+    ys.PROXY_PASSWORD = ys.PROXY_PASSWORD or "benchmark"
+    ys.proxy_pool = ys.ProxyPool([f"bench-{i}" for i in range(1, args.proxies + 1)], cooldown=args.proxy_cooldown)
+
+    # OpenAI SDK 자체 재시도는 끄고 retry_action만 측정
+    ys.aclient = openai.AsyncOpenAI(api_key="benchmark", base_url=server.base_url, max_retries=0)
+
+    ys.CONCURRENT_LIMIT = args.concurrency
+    ys.semaphore = asyncio.Semaphore(args.concurrency)
+    ys.chunk_semaphore = asyncio.Semaphore(ys.CHUNK_CONCURRENT_LIMIT)
+    ys.SHEET_FLUSH_SIZE = args.flush_size
+    ys.SHEET_FLUSH_INTERVAL = args.flush_interval
+    ys.RETRY_BASE_DELAY = args.retry_base_delay
+    ys.USE_BATCH_API = args.batch
+    ys.BATCH_MIN_COUNT = 1 if args.batch else ys.BATCH_MIN_COUNT
+    ys.BATCH_POLL_SEC = 0.2
+    ys.URL_INDEX_PATH = args.index_path
+    ys.START_DATE = "2024-01-01"
+    ys.TEST_NUM = None
+    ys.retry_stats.clear()
+    # 예산/사용량 파일은 실제 실행과 같이 async_main의 load()에서 읽도록 설정값만 바꿈
+    ys.DAILY_TOKEN_BUDGET = args.token_budget
+    ys.TOKEN_USAGE_PATH = args.usage_path
+    ys.token_ledger = ys.TokenLedger()
+
+    # 단계별 지연 시간 측정용 래퍼 (retry_action이 시도할 때마다 기록)
+    get_transcript_sync, summarize_text_task = ys.get_transcript_sync, ys.summarize_text_task
+
+    def timed_transcript(video_id):
+        started = time.perf_counter()
+        try: return get_transcript_sync(video_id)
+        finally: record("자막", time.perf_counter() - started)
+
+    async def timed_summary(text, channel_name=None):
+        started = time.perf_counter()
+        try: return await summarize_text_task(text, channel_name)
+        finally: record("요약", time.perf_counter() - started)
+
+    ys.get_transcript_sync = timed_transcript
+    ys.summarize_text_task = timed_summary
+
+async def run(args):
+    server = await FakeOpenAIServer(args.chat_latency, args.chat_error_rate, args.chat_rate_limit_rate, args.batch_latency).start()
+    spreadsheet = FakeSpreadsheet(args.sheet_latency, args.sheet_error_rate)
+    install_fakes(args, server, spreadsheet)
+    for path in (args.index_path, args.usage_path):
+        if os.path.exists(path): os.remove(path)
+    if args.used_today:
+        # 같은 날 앞선 실행에서 이미 쓴 토큰
+        with open(args.usage_path, "w", encoding="utf-8") as f:
+            json.dump({"date": time.strftime("%Y-%m-%d"), "tokens": args.used_today}, f)
+
+    tracemalloc.start()
+    started = time.perf_counter()
+    try:
+        await ys.async_main()
+    finally:
+        elapsed = time.perf_counter() - started
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        await server.stop()
+        for path in (args.index_path, args.usage_path):
+            if os.path.exists(path): os.remove(path)
+
+    rows = spreadsheet.sheet.rows[1:]
+    summarized = sum(1 for row in rows if not ys.is_failed_status(row[4]) and row[4] != ys.TRANSCRIPT_UNAVAILABLE)
+    unavailable = sum(1 for row in rows if row[4] == ys.TRANSCRIPT_UNAVAILABLE)
+    print("\n" + "=" * 50)
+    print("📊 벤치마크 결과")
+    print("=" * 50)
+    deferred = sum(ys.token_ledger.deferred.values())
+    print(f"영상: {len(rows)}개 기록 / 요약 성공 {summarized}개 / 자막 미제공 {unavailable}개 / 예산 초과로 미룸 {deferred}개 / 소요 {elapsed:.1f}초")
+    print(f"처리량: {len(rows) / elapsed * 60:.1f} videos/min")
+    print(f"메모리: {format_memory(peak)}")
+    print("\n⏱ 단계별 지연 시간 (초, 시도 단위)")
+    for stage, values in latencies.items():
+        print(f"   {stage}: n={len(values)} p50={percentile(values, 50):.2f} p90={percentile(values, 90):.2f} p99={percentile(values, 99):.2f} max={max(values):.2f}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="youtube_summary 오프라인 벤치마크 (가짜 서비스 사용)")
+    parser.add_argument("--channels", type=int, default=3)
+    parser.add_argument("--videos-per-channel", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=ys.CONCURRENT_LIMIT, help="CONCURRENT_LIMIT")
+    parser.add_argument("--flush-size", type=int, default=ys.SHEET_FLUSH_SIZE)
+    parser.add_argument("--flush-interval", type=float, default=ys.SHEET_FLUSH_INTERVAL)
+    parser.add_argument("--retry-base-delay", type=float, default=ys.RETRY_BASE_DELAY)
+    parser.add_argument("--batch", action="store_true", help="Batch API 모드로 요약")
+    parser.add_argument("--batch-latency", type=float, default=3.0, help="가짜 배치 완료까지 걸리는 시간")
+    parser.add_argument("--youtube-latency", type=float, default=0.05)
+    parser.add_argument("--transcript-latency", type=float, default=1.0)
+    parser.add_argument("--transcript-words", type=int, default=2000)
+    parser.add_argument("--long-rate", type=float, default=0.0, help="아주 긴 자막 비율 (map-reduce 요약)")
+    parser.add_argument("--ip-block-rate", type=float, default=0.05, help="IpBlocked 발생 비율")
+    parser.add_argument("--disabled-rate", type=float, default=0.02, help="TranscriptsDisabled 발생 비율")
+    parser.add_argument("--transcript-error-rate", type=float, default=0.02)
+    parser.add_argument("--proxies", type=int, default=10)
+    parser.add_argument("--proxy-cooldown", type=float, default=ys.PROXY_COOLDOWN_SEC)
+    parser.add_argument("--chat-latency", type=float, default=2.0)
+    parser.add_argument("--chat-error-rate", type=float, default=0.02)
+    parser.add_argument("--chat-rate-limit-rate", type=float, default=0.02)
+    parser.add_argument("--sheet-latency", type=float, default=0.5)
+    parser.add_argument("--sheet-error-rate", type=float, default=0.0)
+    parser.add_argument("--token-budget", type=int, default=None, help="DAILY_TOKEN_BUDGET (예산 초과분은 미룸)")
+    parser.add_argument("--used-today", type=int, default=0, help="오늘 앞선 실행에서 이미 쓴 토큰 수")
+    parser.add_argument("--index-path", default="benchmark_url_index.json")
+    parser.add_argument("--usage-path", default="benchmark_token_usage.json")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+
+    if args.seed is not None: random.seed(args.seed)
+    asyncio.run(run(args))
+
+if __name__ == "__main__":
+    main()